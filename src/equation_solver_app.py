@@ -6,7 +6,8 @@ from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk
 
 from solver import solve_equation, process_equation
-from processing import process_image, show_processed_images
+from processing import process_image, precheck_image, \
+    show_processed_images
 from model import Model
 
 
@@ -32,6 +33,7 @@ class EquationSolverApp:
         self.image_path = None
         self.processed_image = None
         self.segmented_chars = []
+        self.precheck = None
         self.debug_mode = tk.BooleanVar(value=False)
 
         self.create_widgets()
@@ -122,6 +124,7 @@ class EquationSolverApp:
 
         if file_path:
             self.image_path = file_path
+            self.precheck = None
             self.status_var.set(f"Image loaded: {os.path.basename(file_path)}")
 
             # Display the original image
@@ -145,6 +148,22 @@ class EquationSolverApp:
 
             # Load image and convert to grayscale
             image = cv.imread(self.image_path)
+            if image is None:
+                raise Exception("Unable to read image.")
+
+            # Reject bad images before running the full pipeline
+            self.precheck = precheck_image(image)
+            self.results_text.delete(1.0, tk.END)
+            self.display_precheck()
+            if not self.precheck["accepted"]:
+                reasons = ", ".join(self.precheck["reasons"])
+                self.segmented_chars = []
+                self.solve_button.config(state=tk.DISABLED)
+                self.status_var.set(f"Image rejected: {reasons}")
+                messagebox.showwarning(
+                    "Image rejected", f"Image rejected: {reasons}")
+                return
+
             [binary, self.segmented_chars,
                 processed_images] = process_image(image, self.debug_mode.get())
 
@@ -166,6 +185,23 @@ class EquationSolverApp:
             messagebox.showerror(
                 "Error", f"Failed to process equation: {str(e)}")
 
+    def display_precheck(self):
+        """Display the pre-check counts and reasons in the results"""
+        if not self.precheck:
+            return
+
+        self.results_text.insert(
+            tk.END,
+            f"Pre-check: blur={self.precheck['blur']:.1f}, "
+            f"contrast={self.precheck['contrast']:.1f}, "
+            f"contours={self.precheck['contour_count']}, "
+            f"glyphs~{self.precheck['glyph_count']} (estimate), "
+            f"time={self.precheck['elapsed_ms']:.1f}ms\n")
+        for reason in self.precheck["reasons"]:
+            self.results_text.insert(tk.END, f"Rejected: {reason}\n")
+        for warning in self.precheck["warnings"]:
+            self.results_text.insert(tk.END, f"Warning: {warning}\n")
+
     def display_original_image(self, file_path):
         """Display the selected image"""
         try:
@@ -246,6 +282,7 @@ class EquationSolverApp:
             equation_str = process_equation(parsed_equation)
 
             self.results_text.delete(1.0, tk.END)
+            self.display_precheck()
             self.results_text.insert(
                 tk.END, f"Detected Equation: {equation_str}\n")
             self.results_text.insert(tk.END, f"Solution: {solve_equation(equation_str)}\n")
@@ -261,6 +298,7 @@ class EquationSolverApp:
         self.image_path = None
         self.processed_image = None
         self.segmented_chars = []
+        self.precheck = None
 
         # Clear UI elements
         self.original_label.config(image="")
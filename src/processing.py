@@ -1,4 +1,5 @@
 import os
+import time
 from os import listdir
 import cv2 as cv
 import numpy as np
@@ -60,6 +61,113 @@ def image_padding(image):
             image, 0, 0, left, right, cv.BORDER_CONSTANT)
 
 
+# thresholds for the pre-check, all measured on the downscaled image
+PRECHECK_MAX_SIDE = 400
+PRECHECK_MIN_BLUR = 100.0       # variance of the laplacian around the glyphs
+PRECHECK_MIN_CONTRAST = 20.0    # gap between the ink and paper mean levels
+PRECHECK_MAX_INK = 0.5          # fraction of the image that is ink
+PRECHECK_MAX_GLYPH_COVER = 0.9  # fraction of the image one glyph can cover
+PRECHECK_MAX_CONTOURS = 150
+PRECHECK_MAX_GLYPHS = 40
+PRECHECK_MAX_GLYPH_SPREAD = 1.0  # std / mean of glyph sizes
+
+
+# cheap quality check on a downscaled copy of the image so that blank,
+# dark or noisy images can be rejected before running the full pipeline.
+# blurry images are only flagged with a warning
+def precheck_image(image):
+    start = time.perf_counter()
+
+    # downscale by a whole factor, INTER_AREA is several times faster
+    # when the scale is an integer
+    height, width = image.shape[:2]
+    factor = int(np.ceil(max(height, width) / PRECHECK_MAX_SIDE))
+    scale = 1.0 / factor
+    small = image
+    if factor > 1:
+        small = cv.resize(image, None, fx=scale, fy=scale,
+                          interpolation=cv.INTER_AREA)
+    grayscaled = cv.cvtColor(small, cv.COLOR_BGR2GRAY)
+
+    _, binarized = cv.threshold(
+        grayscaled, 127, 255, cv.THRESH_BINARY_INV + cv.THRESH_OTSU)
+
+    # contrast is the gap between the means of the two otsu classes so
+    # that it doesn't depend on how much of the page is covered in ink
+    ink = grayscaled[binarized > 0]
+    paper = grayscaled[binarized == 0]
+    contrast = 0.0
+    if ink.size and paper.size:
+        contrast = float(paper.mean() - ink.mean())
+    ink_fraction = ink.size / grayscaled.size
+
+    # no MORPH_CLOSE here, at this scale the 2x2 kernel is wide enough to
+    # join neighbouring characters together
+    contours, _ = cv.findContours(
+        binarized, cv.RETR_EXTERNAL, cv.CHAIN_APPROX_SIMPLE)
+
+    # roughly the same area filter as process_image, scaled to the smaller
+    # image. contourArea is 0 for contours that are only a few pixels wide
+    # so the bounding box is used instead, with a floor so that single
+    # pixel specks aren't counted
+    min_area = max(100 * scale * scale, 2)
+    glyph_mask = np.zeros(grayscaled.shape, np.uint8)
+    glyph_sizes = []
+    glyph_cover = 0.0
+    for contour in contours:
+        x, y, w, h = cv.boundingRect(contour)
+        if w * h > min_area:
+            glyph_sizes.append(max(w, h))
+            glyph_cover = max(glyph_cover, w * h / grayscaled.size)
+            glyph_mask[y:y + h, x:x + w] = 1
+
+    # sharpness is only measured around the glyphs, so a small equation
+    # on a mostly empty page isn't treated as blurry
+    blur = 0.0
+    if glyph_sizes:
+        laplacian = cv.Laplacian(grayscaled, cv.CV_64F)
+        blur = float(laplacian[glyph_mask > 0].var())
+
+    glyph_spread = 0.0
+    if glyph_sizes:
+        glyph_spread = float(np.std(glyph_sizes) / np.mean(glyph_sizes))
+
+    reasons = []
+    warnings = []
+    if ink.size == 0 or paper.size == 0:
+        reasons.append("image is a single flat colour")
+    elif contrast < PRECHECK_MIN_CONTRAST:
+        reasons.append(f"low contrast ({contrast:.1f})")
+    if ink_fraction > PRECHECK_MAX_INK:
+        reasons.append(f"image is mostly dark ({ink_fraction:.0%})")
+    if glyph_cover > PRECHECK_MAX_GLYPH_COVER:
+        reasons.append("one shape covers the whole image")
+    if len(contours) > PRECHECK_MAX_CONTOURS:
+        reasons.append(f"too much noise ({len(contours)} contours)")
+    if len(glyph_sizes) == 0:
+        reasons.append("no characters found")
+    elif len(glyph_sizes) > PRECHECK_MAX_GLYPHS:
+        reasons.append(f"too many characters ({len(glyph_sizes)})")
+    if glyph_sizes and blur < PRECHECK_MIN_BLUR:
+        warnings.append(f"image may be blurry ({blur:.1f})")
+    if glyph_spread > PRECHECK_MAX_GLYPH_SPREAD:
+        warnings.append(
+            f"character sizes vary a lot ({glyph_spread:.2f})")
+
+    return {
+        'accepted': len(reasons) == 0,
+        'reasons': reasons,
+        'warnings': warnings,
+        'blur': blur,
+        'contrast': contrast,
+        'ink_fraction': ink_fraction,
+        'contour_count': len(contours),
+        'glyph_count': len(glyph_sizes),
+        'glyph_spread': glyph_spread,
+        'elapsed_ms': (time.perf_counter() - start) * 1000,
+    }
+
+
 # process image to be passed into model when predicting
 def process_image(image, isDebug: bool):
     img_original = image.copy()
@@ -190,8 +298,44 @@ def organize_dir(dir_path: str = "processed/"):
         os.rename(img_path, folder + '/' + file)
 
 
+# cases the pre-check thresholds were tuned on
+# (run from the root of the project)
+def check_precheck():
+    page = np.full((3024, 4032, 3), 255, np.uint8)
+    eqslanted = cv.imread("img/eqslanted.jpg")
+    eq_on_page = page.copy()
+    eq_on_page[1200:1200 + eqslanted.shape[0],
+               1600:1600 + eqslanted.shape[1]] = eqslanted
+    pencil = np.full((3024, 4032, 3), 170, np.uint8)
+    cv.putText(pencil, "2x+3=7", (1200, 1500), cv.FONT_HERSHEY_SIMPLEX,
+               6, (110, 110, 110), 8)
+    noise = np.random.default_rng(0).integers(
+        0, 256, (3024, 4032, 3), dtype=np.uint8)
+
+    cases = [
+        ("eqhw", cv.imread("img/eqhw.jpg"), True),
+        ("eqslanted", eqslanted, True),
+        ("eqslanted on a large page", eq_on_page, True),
+        ("pencil on grey paper", pencil, True),
+        ("blank", page, False),
+        ("black", np.zeros_like(page), False),
+        ("noise", noise, False),
+        ("inverted eqslanted", cv.bitwise_not(eqslanted), False),
+    ]
+    for name, image, expected in cases:
+        result = precheck_image(image)
+        print(f"{name}: accepted={result['accepted']} "
+              f"contrast={result['contrast']:.1f} "
+              f"ink={result['ink_fraction']:.2f} "
+              f"blur={result['blur']:.1f} "
+              f"glyphs={result['glyph_count']} "
+              f"time={result['elapsed_ms']:.1f}ms {result['reasons']}")
+        assert result['accepted'] == expected, name
+
+
 def main():
     # organize_dir()
+    # check_precheck()
     process_dataset("dataset/", "processed/")
 
 